@@ -0,0 +1,54 @@
+"""
+Cache Helper Functions
+
+Optional Redis cache used to keep hot lookups (like auth sessions) off MongoDB.
+Caching is enabled when REDIS_URL is set; otherwise every helper is a no-op
+and callers fall back to the database. Redis errors on reads and writes are
+treated the same way, so a Redis outage degrades to database lookups; a failed
+invalidation is raised, since swallowing it would leave the token usable.
+"""
+
+import json
+import os
+from typing import Optional
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+redis = None
+
+redis_url = os.getenv("REDIS_URL")
+
+if redis_url:
+    from redis.asyncio import Redis
+    from redis.exceptions import RedisError
+    redis = Redis.from_url(redis_url, decode_responses=True)
+
+SESSION_PREFIX = "sess:"
+
+async def cache_session(token: str, user: dict, ttl_seconds: int):
+    """Store the session's user under its token for ttl_seconds"""
+    if redis is None or ttl_seconds <= 0:
+        return
+    try:
+        await redis.setex(f"{SESSION_PREFIX}{token}", ttl_seconds, json.dumps(user))
+    except RedisError as e:
+        print("Session cache error:", e)
+
+async def get_cached_session(token: str) -> Optional[dict]:
+    """Return the cached user for a token, or None on a miss"""
+    if redis is None:
+        return None
+    try:
+        data = await redis.get(f"{SESSION_PREFIX}{token}")
+    except RedisError as e:
+        print("Session cache error:", e)
+        return None
+    return json.loads(data) if data else None
+
+async def drop_session(token: str):
+    """Invalidate a cached session; Redis errors propagate to the caller"""
+    if redis is None:
+        return
+    await redis.delete(f"{SESSION_PREFIX}{token}")
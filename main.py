@@ -1,16 +1,37 @@
+import asyncio
 import os
+import re
+import secrets
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from database import db, create_document, get_documents, ensure_indexes
+from cache import cache_session, get_cached_session, drop_session
+from schemas import (
+    RegisterRequest, LoginRequest, AuthResponse,
+    MovieCreate, ShowCreate,
+    CreateBookingRequest, CreateBookingResponse,
+    SeedResponse,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Indexes first: seeding relies on the unique keys to stay idempotent
+    await create_indexes()
+    await asyncio.gather(migrate_seat_rows(), auto_seed_if_empty())
+    yield
 
-from database import db, create_document, get_documents
-from schemas import User, Movie, Show, Booking, Session
 
-app = FastAPI(title="Movie Ticket Booking API")
+app = FastAPI(title="Movie Ticket Booking API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +41,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger payloads such as seat maps; tiny responses aren't worth it
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # Helpers
 
 def oid(id_str: str) -> ObjectId:
@@ -33,6 +57,19 @@ def now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def as_utc(dt: datetime) -> datetime:
+    """Mongo returns naive UTC datetimes; make them comparable with now_utc()"""
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+SESSION_TTL = timedelta(days=7)
+
+
+def session_user(user: dict) -> dict:
+    """Minimal user view stored in the session cache"""
+    return {"_id": str(user["_id"]), "name": user["name"], "email": user["email"]}
+
+
 # Simple hash for demo (note: for production use passlib/bcrypt)
 import hashlib
 
@@ -40,43 +77,73 @@ def hash_password(pw: str) -> str:
     return hashlib.sha256(pw.encode()).hexdigest()
 
 
-# Auth models
-class RegisterRequest(BaseModel):
-    name: str
-    email: EmailStr
-    password: str
+# Seat maps are stored as one bitmask per row in show.seat_rows: bit c-1 of
+# seat_rows[r] is set when seat (row r, column c) is booked.
+# Rows A-T and columns 1-30 match the Show rows/cols limits; ASCII digits only,
+# no leading zeros, so every seat has exactly one spelling.
+SEAT_ID = re.compile(r"[A-T]([1-9]|[12][0-9]|30)")
+
+
+def parse_seat(seat_id: str) -> tuple:
+    """'B7' -> (1, 7): zero-based row index, one-based column"""
+    if not SEAT_ID.fullmatch(seat_id):
+        raise HTTPException(status_code=400, detail=f"Invalid seat {seat_id}")
+    return ord(seat_id[0]) - ord("A"), int(seat_id[1:])
 
-class LoginRequest(BaseModel):
-    email: EmailStr
-    password: str
 
-class AuthResponse(BaseModel):
-    token: str
-    user_id: str
-    name: str
-    email: EmailStr
+def format_seat(row: int, col: int) -> str:
+    """Inverse of parse_seat: (1, 7) -> 'B7'"""
+    return f"{chr(ord('A') + row)}{col}"
+
+
+def seat_masks(positions: list) -> dict:
+    """Group parsed (row, col) positions into {row index: bitmask}"""
+    masks = {}
+    for r, c in positions:
+        masks[r] = masks.get(r, 0) | (1 << (c - 1))
+    return masks
+
+
+def booked_seats(seat_rows: list) -> list:
+    """Expand seat_rows bitmasks back into ids like ['A1', 'B5']"""
+    return [
+        format_seat(r, c)
+        for r, bits in enumerate(seat_rows)
+        for c in range(1, bits.bit_length() + 1)
+        if bits >> (c - 1) & 1
+    ]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    return bool(if_none_match) and etag in (t.strip() for t in if_none_match.split(","))
 
 
 async def get_current_user(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing auth token")
-    token = authorization.split(" ", 1)[1]
-    session = db["session"].find_one({"token": token, "expires_at": {"$gt": now_utc()}})
+    token = authorization[7:]  # len("Bearer ")
+    cached = await get_cached_session(token)
+    if cached:
+        return cached, token
+    now = now_utc()
+    session = await db["session"].find_one({"token": token, "expires_at": {"$gt": now}}, {"user_id": 1, "expires_at": 1})
     if not session:
         raise HTTPException(status_code=401, detail="Invalid/expired token")
-    user = db["user"].find_one({"_id": session["user_id"] if isinstance(session["user_id"], ObjectId) else oid(session["user_id"])})
+    user = await db["user"].find_one({"_id": session["user_id"] if isinstance(session["user_id"], ObjectId) else oid(session["user_id"])}, {"name": 1, "email": 1})
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    user = session_user(user)
+    await cache_session(token, user, int((as_utc(session["expires_at"]) - now).total_seconds()))
     return user, token
 
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Movie Booking API running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -92,7 +159,7 @@ def test_database():
             response["database_name"] = getattr(db, 'name', 'unknown')
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()[:10]
+                response["collections"] = (await db.list_collection_names())[:10]
             except Exception as e:
                 response["database"] = f"⚠️ Connected but error: {str(e)[:50]}"
     except Exception as e:
@@ -104,297 +171,315 @@ def test_database():
 
 
 # Auth endpoints
+# Endpoints return ORJSONResponse directly: response_model only documents the
+# shape, FastAPI skips re-validating data we built ourselves.
 @app.post("/auth/register", response_model=AuthResponse)
-def register(payload: RegisterRequest):
-    existing = db["user"].find_one({"email": payload.email})
+async def register(payload: RegisterRequest):
+    existing = await db["user"].find_one({"email": payload.email}, {"_id": 1})
     if existing:
         raise HTTPException(status_code=409, detail="Email already registered")
-    user = User(name=payload.name, email=payload.email, password_hash=hash_password(payload.password))
-    user_id = create_document("user", user)
-    token = hashlib.sha256(f"{payload.email}{now_utc().isoformat()}".encode()).hexdigest()
-    session = Session(user_id=str(user_id), token=token, expires_at=now_utc() + timedelta(days=7))
-    create_document("session", session)
-    return AuthResponse(token=token, user_id=str(user_id), name=payload.name, email=payload.email)
+    try:
+        user_id = await create_document("user", {"name": payload.name, "email": payload.email, "password_hash": hash_password(payload.password)})
+    except DuplicateKeyError:
+        # lost a race with a concurrent registration; the unique index caught it
+        raise HTTPException(status_code=409, detail="Email already registered")
+    token = secrets.token_urlsafe(32)
+    await create_document("session", {"user_id": str(user_id), "token": token, "expires_at": now_utc() + SESSION_TTL})
+    await cache_session(token, {"_id": str(user_id), "name": payload.name, "email": payload.email}, int(SESSION_TTL.total_seconds()))
+    return ORJSONResponse(content={"token": token, "user_id": str(user_id), "name": payload.name, "email": payload.email})
 
 
 @app.post("/auth/login", response_model=AuthResponse)
-def login(payload: LoginRequest):
-    user = db["user"].find_one({"email": payload.email})
+async def login(payload: LoginRequest):
+    user = await db["user"].find_one({"email": payload.email}, {"name": 1, "email": 1, "password_hash": 1})
     if not user or user.get("password_hash") != hash_password(payload.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = hashlib.sha256(f"{payload.email}{now_utc().isoformat()}".encode()).hexdigest()
-    session = Session(user_id=str(user["_id"]), token=token, expires_at=now_utc() + timedelta(days=7))
-    create_document("session", session)
-    return AuthResponse(token=token, user_id=str(user["_id"]), name=user["name"], email=user["email"])
+    token = secrets.token_urlsafe(32)
+    await create_document("session", {"user_id": str(user["_id"]), "token": token, "expires_at": now_utc() + SESSION_TTL})
+    await cache_session(token, session_user(user), int(SESSION_TTL.total_seconds()))
+    return ORJSONResponse(content={"token": token, "user_id": str(user["_id"]), "name": user["name"], "email": user["email"]})
 
 
-# Movies
-class MovieCreate(BaseModel):
-    title: str
-    description: Optional[str] = None
-    duration_minutes: int
-    rating: Optional[str] = None
-    poster_url: Optional[str] = None
-    backdrop_url: Optional[str] = None
-    genre: List[str] = []
+@app.post("/auth/logout")
+async def logout(user=Depends(get_current_user)):
+    token = user[1]
+    # drop the cached copy first: if Redis fails the request errors out and the
+    # session stays intact, instead of the cache outliving the Mongo row
+    await drop_session(token)
+    await db["session"].delete_one({"token": token})
+    return {"message": "Logged out"}
 
+
+# Movies
 @app.post("/movies")
-def create_movie(payload: MovieCreate, user=Depends(get_current_user)):
-    movie = Movie(**payload.model_dump())
-    mid = create_document("movie", movie)
+async def create_movie(payload: MovieCreate, user=Depends(get_current_user)):
+    try:
+        mid = await create_document("movie", payload.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Movie already exists")
     return {"id": mid}
 
 @app.get("/movies")
-def list_movies():
-    movies = get_documents("movie")
+async def list_movies(if_none_match: Optional[str] = Header(None)):
+    movies = await get_documents("movie")
+    latest = max((m["updated_at"] for m in movies if m.get("updated_at")), default=None)
+    etag = f'W/"{len(movies)}-{as_utc(latest).timestamp() if latest else 0}"'
+    headers = {"Cache-Control": "public, max-age=60", "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
     for m in movies:
         m["id"] = str(m.pop("_id"))
-    return movies
+    return ORJSONResponse(content=movies, headers=headers)
 
 
 # Shows
-class ShowCreate(BaseModel):
-    movie_id: str
-    start_time: datetime
-    screen: str
-    price_cents: int
-    rows: int
-    cols: int
-
 @app.post("/shows")
-def create_show(payload: ShowCreate, user=Depends(get_current_user)):
+async def create_show(payload: ShowCreate, user=Depends(get_current_user)):
     # validate movie exists
-    movie = db["movie"].find_one({"_id": oid(payload.movie_id)})
+    movie = await db["movie"].find_one({"_id": oid(payload.movie_id)}, {"_id": 1})
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    show = Show(**payload.model_dump(), seats_booked=[])
-    sid = create_document("show", show)
+    try:
+        sid = await create_document("show", {**payload.model_dump(), "seat_rows": [0] * payload.rows})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Show already exists for this screen and time")
     return {"id": sid}
 
 @app.get("/shows")
-def list_shows(movie_id: Optional[str] = None):
+async def list_shows(movie_id: Optional[str] = None):
     q = {"movie_id": movie_id} if movie_id else {}
-    shows = get_documents("show", q)
+    shows = await get_documents("show", q)
     for s in shows:
         s["id"] = str(s.pop("_id"))
-    return shows
+        # keep the public seats_booked shape; seat_rows is a storage detail
+        s["seats_booked"] = booked_seats(s.pop("seat_rows", None) or [])
+    return ORJSONResponse(content=shows)
 
 
 # Seat map for a show
 @app.get("/shows/{show_id}/seats")
-def get_seats(show_id: str):
-    show = db["show"].find_one({"_id": oid(show_id)})
+async def get_seats(show_id: str, if_none_match: Optional[str] = Header(None)):
+    show = await db["show"].find_one({"_id": oid(show_id)}, {"rows": 1, "cols": 1, "seat_rows": 1})
     if not show:
         raise HTTPException(status_code=404, detail="Show not found")
     rows, cols = show["rows"], show["cols"]
-    booked = set(show.get("seats_booked", []))
-    seats = []
-    for r in range(rows):
-        row_label = chr(ord('A') + r)
-        row = []
-        for c in range(1, cols + 1):
-            sid = f"{row_label}{c}"
-            row.append({"id": sid, "booked": sid in booked})
-        seats.append({"row": row_label, "seats": row})
-    return {"rows": rows, "cols": cols, "layout": seats}
+    seat_rows = show.get("seat_rows") or [0] * rows
+    # short max-age: availability changes as bookings come in
+    digest = hashlib.sha1(f"{rows}x{cols}:{seat_rows}".encode()).hexdigest()
+    etag = f'W/"{digest}"'
+    headers = {"Cache-Control": "public, max-age=5", "ETag": etag}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    row_labels = [chr(ord('A') + r) for r in range(rows)]
+    col_labels = [str(c) for c in range(1, cols + 1)]
+    seats = [
+        {"row": rl, "seats": [{"id": rl + cl, "booked": bool(bits >> c & 1)} for c, cl in enumerate(col_labels)]}
+        for rl, bits in zip(row_labels, seat_rows)
+    ]
+    return ORJSONResponse(content={"rows": rows, "cols": cols, "layout": seats}, headers=headers)
 
 
 # Booking
-class CreateBookingRequest(BaseModel):
-    show_id: str
-    seats: List[str]
-
-class CreateBookingResponse(BaseModel):
-    booking_id: str
-    amount_cents: int
-    status: str
-
 @app.post("/bookings", response_model=CreateBookingResponse)
-def create_booking(payload: CreateBookingRequest, user=Depends(get_current_user)):
-    show = db["show"].find_one({"_id": oid(payload.show_id)})
+async def create_booking(payload: CreateBookingRequest, user=Depends(get_current_user)):
+    show_oid = oid(payload.show_id)
+    # dedupe on the parsed position so each seat is reserved and charged once
+    positions = list(dict.fromkeys(parse_seat(s) for s in payload.seats))
+    if not positions:
+        raise HTTPException(status_code=400, detail="No seats selected")
+    seats = [format_seat(r, c) for r, c in positions]
+    masks = seat_masks(positions)
+    # reserve seats atomically: only matches if the show is big enough and
+    # none of the requested bits are set yet, so the happy path is one round-trip
+    query = {
+        "_id": show_oid,
+        "rows": {"$gt": max(masks)},
+        "cols": {"$gte": max(m.bit_length() for m in masks.values())},
+    }
+    for r, m in masks.items():
+        query[f"seat_rows.{r}"] = {"$bitsAllClear": m}
+    show = await db["show"].find_one_and_update(
+        query,
+        {"$bit": {f"seat_rows.{r}": {"or": m} for r, m in masks.items()}},
+        projection={"price_cents": 1},
+    )
     if not show:
-        raise HTTPException(status_code=404, detail="Show not found")
-    # check seat availability
-    booked = set(show.get("seats_booked", []))
-    for s in payload.seats:
-        if s in booked:
-            raise HTTPException(status_code=400, detail=f"Seat {s} already booked")
-    amount = len(payload.seats) * int(show["price_cents"])
-    booking = Booking(user_id=str(user[0]["_id"]), show_id=payload.show_id, seats=payload.seats, amount_cents=amount)
-    bid = create_document("booking", booking)
-    # update show booked seats
-    db["show"].update_one({"_id": oid(payload.show_id)}, {"$addToSet": {"seats_booked": {"$each": payload.seats}}})
-    return CreateBookingResponse(booking_id=str(bid), amount_cents=amount, status="confirmed")
+        # conflict: one targeted read to tell the client which seat failed
+        current = await db["show"].find_one({"_id": show_oid}, {"rows": 1, "cols": 1, "seat_rows": 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Show not found")
+        seat_rows = current.get("seat_rows") or []
+        taken = seats[0]
+        for s, (r, c) in zip(seats, positions):
+            if r >= current["rows"] or c > current["cols"]:
+                raise HTTPException(status_code=400, detail=f"Invalid seat {s}")
+            if r < len(seat_rows) and seat_rows[r] >> (c - 1) & 1:
+                taken = s
+                break
+        raise HTTPException(status_code=400, detail=f"Seat {taken} already booked")
+    amount = len(seats) * int(show["price_cents"])
+    booking = {"user_id": str(user[0]["_id"]), "show_id": payload.show_id, "seats": seats, "amount_cents": amount, "status": "confirmed"}
+    try:
+        bid = await create_document("booking", booking)
+    except Exception:
+        # release the reservation so the seats don't stay locked
+        await db["show"].update_one({"_id": show_oid}, {"$bit": {f"seat_rows.{r}": {"and": ~m} for r, m in masks.items()}})
+        raise
+    return ORJSONResponse(content={"booking_id": str(bid), "amount_cents": amount, "status": "confirmed"})
 
 
 # Public booking view
 @app.get("/bookings/{booking_id}")
-def get_booking(booking_id: str):
-    b = db["booking"].find_one({"_id": oid(booking_id)})
+async def get_booking(booking_id: str):
+    b = await db["booking"].find_one({"_id": oid(booking_id)})
     if not b:
         raise HTTPException(status_code=404, detail="Not found")
     b["id"] = str(b.pop("_id"))
-    return b
+    return ORJSONResponse(content=b)
+
+
+# Demo catalog used by the seed endpoint and the startup auto-seed
+POSTERS = {
+    "Neon Skies": "https://images.unsplash.com/photo-1524985069026-dd778a71c7b4?q=80&w=1200&auto=format&fit=crop",
+    "Quantum Drift": "https://images.unsplash.com/photo-1542204165-65bf26472b9b?q=80&w=1200&auto=format&fit=crop",
+    "Echoes of Orion": "https://images.unsplash.com/photo-1497032628192-86f99bcd76bc?q=80&w=1200&auto=format&fit=crop",
+}
+
+CATALOG = (
+    {
+        "title": "Neon Skies",
+        "description": "A synthwave-soaked heist across a city of light.",
+        "duration_minutes": 118,
+        "rating": "PG-13",
+        "poster_url": POSTERS["Neon Skies"],
+        "backdrop_url": POSTERS["Neon Skies"],
+        "genre": ["Action", "Sci-Fi"],
+    },
+    {
+        "title": "Quantum Drift",
+        "description": "A pilot learns to bend time to save her crew.",
+        "duration_minutes": 124,
+        "rating": "PG-13",
+        "poster_url": POSTERS["Quantum Drift"],
+        "backdrop_url": POSTERS["Quantum Drift"],
+        "genre": ["Adventure", "Sci-Fi"],
+    },
+    {
+        "title": "Echoes of Orion",
+        "description": "Two strangers share dreams from a distant star.",
+        "duration_minutes": 110,
+        "rating": "PG",
+        "poster_url": POSTERS["Echoes of Orion"],
+        "backdrop_url": POSTERS["Echoes of Orion"],
+        "genre": ["Drama", "Romance"],
+    },
+)
 
+SHOW_DEFAULTS = (
+    {"screen": "A", "rows": 6, "cols": 10, "price_cents": 1299, "offset_hours": 2},
+    {"screen": "B", "rows": 8, "cols": 12, "price_cents": 1499, "offset_hours": 5},
+    {"screen": "C", "rows": 10, "cols": 14, "price_cents": 1799, "offset_hours": 28},
+)
 
-# Admin: seed demo data (requires auth)
-class SeedResponse(BaseModel):
-    movies_created: int
-    shows_created: int
 
+async def seed_catalog() -> dict:
+    """Upsert the demo movies and shows; safe to run concurrently"""
+    # The unique indexes on movie.title and show (movie_id, start_time, screen)
+    # make concurrent upserts of the same key resolve to a single document.
+    now = now_utc()
+    movies = await db["movie"].bulk_write([
+        UpdateOne({"title": m["title"]}, {"$setOnInsert": {**m, "created_at": now, "updated_at": now}}, upsert=True)
+        for m in CATALOG
+    ], ordered=False)
+    titles = [m["title"] for m in CATALOG]
+    mids = [str(d["_id"]) async for d in db["movie"].find({"title": {"$in": titles}}, {"_id": 1})]
+
+    start = now.replace(minute=0, second=0, microsecond=0)
+    shows = await db["show"].bulk_write([
+        UpdateOne(
+            {"movie_id": mid, "start_time": start + timedelta(hours=cfg["offset_hours"]), "screen": cfg["screen"]},
+            {"$setOnInsert": {
+                "price_cents": cfg["price_cents"],
+                "rows": cfg["rows"],
+                "cols": cfg["cols"],
+                "seat_rows": [0] * cfg["rows"],
+                "created_at": now,
+                "updated_at": now,
+            }},
+            upsert=True,
+        )
+        for mid in mids
+        for cfg in SHOW_DEFAULTS
+    ], ordered=False)
+
+    return {"movies_created": movies.upserted_count, "shows_created": shows.upserted_count}
+
+
+# Admin: seed demo data (requires auth)
 @app.post("/admin/seed", response_model=SeedResponse)
-def seed_demo(user=Depends(get_current_user)):
-    posters = {
-        "Neon Skies": "https://images.unsplash.com/photo-1524985069026-dd778a71c7b4?q=80&w=1200&auto=format&fit=crop",
-        "Quantum Drift": "https://images.unsplash.com/photo-1542204165-65bf26472b9b?q=80&w=1200&auto=format&fit=crop",
-        "Echoes of Orion": "https://images.unsplash.com/photo-1497032628192-86f99bcd76bc?q=80&w=1200&auto=format&fit=crop",
-    }
+async def seed_demo(user=Depends(get_current_user)):
+    return ORJSONResponse(content=await seed_catalog())
 
-    catalog = [
-        {
-            "title": "Neon Skies",
-            "description": "A synthwave-soaked heist across a city of light.",
-            "duration_minutes": 118,
-            "rating": "PG-13",
-            "poster_url": posters["Neon Skies"],
-            "backdrop_url": posters["Neon Skies"],
-            "genre": ["Action", "Sci-Fi"],
-        },
-        {
-            "title": "Quantum Drift",
-            "description": "A pilot learns to bend time to save her crew.",
-            "duration_minutes": 124,
-            "rating": "PG-13",
-            "poster_url": posters["Quantum Drift"],
-            "backdrop_url": posters["Quantum Drift"],
-            "genre": ["Adventure", "Sci-Fi"],
-        },
-        {
-            "title": "Echoes of Orion",
-            "description": "Two strangers share dreams from a distant star.",
-            "duration_minutes": 110,
-            "rating": "PG",
-            "poster_url": posters["Echoes of Orion"],
-            "backdrop_url": posters["Echoes of Orion"],
-            "genre": ["Drama", "Romance"],
-        },
-    ]
 
-    movies_created = 0
-    shows_created = 0
-
-    id_by_title = {}
-
-    # Ensure movies
-    for m in catalog:
-        existing = db["movie"].find_one({"title": m["title"]})
-        if existing:
-            id_by_title[m["title"]] = str(existing["_id"])
-            continue
-        movie = Movie(**m)
-        mid = create_document("movie", movie)
-        id_by_title[m["title"]] = str(mid)
-        movies_created += 1
-
-    # Ensure shows
-    now = now_utc().replace(minute=0, second=0, microsecond=0)
-    defaults = [
-        {"screen": "A", "rows": 6, "cols": 10, "price_cents": 1299, "offset_hours": 2},
-        {"screen": "B", "rows": 8, "cols": 12, "price_cents": 1499, "offset_hours": 5},
-        {"screen": "C", "rows": 10, "cols": 14, "price_cents": 1799, "offset_hours": 28},
-    ]
+# Ensure indexes on startup
+async def create_indexes():
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        # log but don't crash
+        print("Index creation error:", e)
 
-    for title, mid in id_by_title.items():
-        for cfg in defaults:
-            start_time = now + timedelta(hours=cfg["offset_hours"])
-            exists = db["show"].find_one({
-                "movie_id": mid,
-                "start_time": {"$gte": start_time - timedelta(minutes=1), "$lte": start_time + timedelta(minutes=1)},
-                "screen": cfg["screen"],
-            })
-            if exists:
-                continue
-            payload = Show(
-                movie_id=mid,
-                start_time=start_time,
-                screen=cfg["screen"],
-                price_cents=cfg["price_cents"],
-                rows=cfg["rows"],
-                cols=cfg["cols"],
-                seats_booked=[],
-            )
-            create_document("show", payload)
-            shows_created += 1
 
-    return SeedResponse(movies_created=movies_created, shows_created=shows_created)
+# Add per-row bitmasks to shows stored with only a seats_booked list
+async def migrate_seat_rows():
+    try:
+        async for show in db["show"].find({"seat_rows": {"$exists": False}}, {"rows": 1, "seats_booked": 1}):
+            seat_rows = [0] * show["rows"]
+            skipped = []
+            for s in show.get("seats_booked", []):
+                try:
+                    r, c = parse_seat(s)
+                except HTTPException:
+                    skipped.append(s)
+                    continue
+                if r < len(seat_rows):
+                    seat_rows[r] |= 1 << (c - 1)
+                else:
+                    skipped.append(s)
+            if skipped:
+                print(f"Seat map migration: show {show['_id']} skipped seats {skipped}")
+            # only write if nobody migrated it meanwhile, so bookings made
+            # against seat_rows since are never overwritten; seats_booked is
+            # left in place as the original record
+            await db["show"].update_one(
+                {"_id": show["_id"], "seat_rows": {"$exists": False}},
+                {"$set": {"seat_rows": seat_rows}},
+            )
+    except Exception as e:
+        # log but don't crash
+        print("Seat map migration error:", e)
 
 
 # Auto-seed on startup if empty
-@app.on_event("startup")
-def auto_seed_if_empty():
+async def auto_seed_if_empty():
     try:
-        movies_count = db["movie"].count_documents({})
+        movies_count = await db["movie"].count_documents({})
         if movies_count == 0:
-            # Use the same seeding logic without requiring auth
-            posters = {
-                "Neon Skies": "https://images.unsplash.com/photo-1524985069026-dd778a71c7b4?q=80&w=1200&auto=format&fit=crop",
-                "Quantum Drift": "https://images.unsplash.com/photo-1542204165-65bf26472b9b?q=80&w=1200&auto=format&fit=crop",
-                "Echoes of Orion": "https://images.unsplash.com/photo-1497032628192-86f99bcd76bc?q=80&w=1200&auto=format&fit=crop",
-            }
-            catalog = [
-                {
-                    "title": "Neon Skies",
-                    "description": "A synthwave-soaked heist across a city of light.",
-                    "duration_minutes": 118,
-                    "rating": "PG-13",
-                    "poster_url": posters["Neon Skies"],
-                    "backdrop_url": posters["Neon Skies"],
-                    "genre": ["Action", "Sci-Fi"],
-                },
-                {
-                    "title": "Quantum Drift",
-                    "description": "A pilot learns to bend time to save her crew.",
-                    "duration_minutes": 124,
-                    "rating": "PG-13",
-                    "poster_url": posters["Quantum Drift"],
-                    "backdrop_url": posters["Quantum Drift"],
-                    "genre": ["Adventure", "Sci-Fi"],
-                },
-                {
-                    "title": "Echoes of Orion",
-                    "description": "Two strangers share dreams from a distant star.",
-                    "duration_minutes": 110,
-                    "rating": "PG",
-                    "poster_url": posters["Echoes of Orion"],
-                    "backdrop_url": posters["Echoes of Orion"],
-                    "genre": ["Drama", "Romance"],
-                },
-            ]
-            id_by_title = {}
-            for m in catalog:
-                movie = Movie(**m)
-                mid = create_document("movie", movie)
-                id_by_title[m["title"]] = str(mid)
-
-            now = now_utc().replace(minute=0, second=0, microsecond=0)
-            defaults = [
-                {"screen": "A", "rows": 6, "cols": 10, "price_cents": 1299, "offset_hours": 2},
-                {"screen": "B", "rows": 8, "cols": 12, "price_cents": 1499, "offset_hours": 5},
-                {"screen": "C", "rows": 10, "cols": 14, "price_cents": 1799, "offset_hours": 28},
-            ]
-            for title, mid in id_by_title.items():
-                for cfg in defaults:
-                    start_time = now + timedelta(hours=cfg["offset_hours"])
-                    payload = Show(
-                        movie_id=mid,
-                        start_time=start_time,
-                        screen=cfg["screen"],
-                        price_cents=cfg["price_cents"],
-                        rows=cfg["rows"],
-                        cols=cfg["cols"],
-                        seats_booked=[],
-                    )
-                    create_document("show", payload)
+            await seed_catalog()
     except Exception as e:
         # log but don't crash
         print("Auto seed error:", e)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        access_log=False,
+    )
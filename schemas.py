@@ -7,20 +7,40 @@ Each Pydantic model maps to a MongoDB collection named by the lowercase of the c
 - Show -> "show"
 - Booking -> "booking"
 - Session -> "session"
+
+The request/response models at the bottom of this file are API payloads only
+and are not stored in their own collections.
 """
 
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, StringConstraints
+from typing import Annotated, List, Optional
 from datetime import datetime
 
+def normalize_email(email: str) -> str:
+    """Lowercase the domain, matching how EmailStr stored existing users"""
+    local, _, domain = email.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+# Cheap structural email check, run by pydantic-core's regex engine instead of
+# the email-validator package
+Email = Annotated[str, StringConstraints(pattern=r"^[^@\s]+@[^@\s]+\.[^@\s]+$"), AfterValidator(normalize_email)]
+
+# Shared by every model. These are pydantic's defaults, spelled out so the
+# validation behaviour is explicit in one place.
+MODEL_CONFIG = ConfigDict(extra="ignore", validate_default=False, validate_assignment=False, str_strip_whitespace=False)
+
 class User(BaseModel):
+    model_config = MODEL_CONFIG
+
     name: str = Field(..., description="Full name")
-    email: EmailStr = Field(..., description="Email address")
+    email: Email = Field(..., description="Email address")
     password_hash: str = Field(..., description="BCrypt hash of the password")
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
 class Movie(BaseModel):
+    model_config = MODEL_CONFIG
+
     title: str
     description: Optional[str] = None
     duration_minutes: int = Field(..., ge=1)
@@ -32,17 +52,21 @@ class Movie(BaseModel):
     updated_at: Optional[datetime] = None
 
 class Show(BaseModel):
+    model_config = MODEL_CONFIG
+
     movie_id: str = Field(..., description="ObjectId as string of the movie")
     start_time: datetime
     screen: str
     price_cents: int = Field(..., ge=0)
     rows: int = Field(..., ge=1, le=20)
     cols: int = Field(..., ge=1, le=30)
-    seats_booked: List[str] = Field(default_factory=list, description="Seat IDs like A1, B5")
+    seat_rows: List[int] = Field(default_factory=list, description="Booked-seat bitmask per row; bit c-1 of seat_rows[r] is seat (row r, column c)")
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
 class Booking(BaseModel):
+    model_config = MODEL_CONFIG
+
     user_id: str
     show_id: str
     seats: List[str]
@@ -52,8 +76,74 @@ class Booking(BaseModel):
     updated_at: Optional[datetime] = None
 
 class Session(BaseModel):
+    model_config = MODEL_CONFIG
+
     user_id: str
     token: str
     expires_at: datetime
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+
+# API request/response models
+
+class RegisterRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
+    name: str
+    email: Email
+    password: str
+
+class LoginRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
+    email: Email
+    password: str
+
+class AuthResponse(BaseModel):
+    model_config = MODEL_CONFIG
+
+    token: str
+    user_id: str
+    name: str
+    email: Email
+
+class MovieCreate(BaseModel):
+    model_config = MODEL_CONFIG
+
+    title: str
+    description: Optional[str] = None
+    duration_minutes: int = Field(..., ge=1)
+    rating: Optional[str] = None
+    poster_url: Optional[str] = None
+    backdrop_url: Optional[str] = None
+    genre: List[str] = []
+
+class ShowCreate(BaseModel):
+    model_config = MODEL_CONFIG
+
+    movie_id: str
+    start_time: datetime
+    screen: str
+    price_cents: int = Field(..., ge=0)
+    rows: int = Field(..., ge=1, le=20)
+    cols: int = Field(..., ge=1, le=30)
+
+class CreateBookingRequest(BaseModel):
+    model_config = MODEL_CONFIG
+
+    show_id: str
+    seats: List[str]
+
+class CreateBookingResponse(BaseModel):
+    model_config = MODEL_CONFIG
+
+    booking_id: str
+    amount_cents: int
+    status: str
+
+class SeedResponse(BaseModel):
+    model_config = MODEL_CONFIG
+
+    movies_created: int
+    shows_created: int